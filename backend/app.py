@@ -3,18 +3,18 @@ FastAPI backend for Billboard Artists collaboration graph.
 For now, handles data updates & PNG generation.
 """
 
-import json
+import asyncio
 import subprocess
 import sys
 from pathlib import Path
 from typing import Dict, Any, List
 import logging
-import tempfile
-import os
 
+import numpy as np
+import orjson
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, Response
 from pydantic import BaseModel
 
 from data_access import DataAccessLayer
@@ -39,14 +39,14 @@ app.add_middleware(
 BASE_DIR = Path(__file__).parent
 SCRIPTS_DIR = BASE_DIR / "scripts"
 DATA_DIR = BASE_DIR / "data"
-STATIC_DIR = BASE_DIR / "static"
 
-# Ensure static directory exists
-STATIC_DIR.mkdir(exist_ok=True)
+def load_data_access_layer() -> DataAccessLayer:
+    """Load the processed data files into a new Data Access Layer"""
+    return DataAccessLayer(DATA_DIR / "collaborations.json", DATA_DIR / "songs_to_artists.json")
 
 # Initialize Data Access Layer
 try:
-    dal = DataAccessLayer(DATA_DIR / "collaborations.json", DATA_DIR / "songs_to_artists.json")
+    dal = load_data_access_layer()
 except Exception as e:
     logger.error(f"Failed to initialize DAL: {e}")
     dal = None
@@ -69,8 +69,8 @@ class UpdateStatus:
 
 update_status = UpdateStatus()
 
-def run_script(script_name: str, *args) -> subprocess.CompletedProcess:
-    """Run a Python script with error handling"""
+async def run_script(script_name: str, *args) -> subprocess.CompletedProcess:
+    """Run a Python script with error handling, without blocking the event loop"""
     script_path = SCRIPTS_DIR / script_name
     if not script_path.exists():
         raise FileNotFoundError(f"Script {script_name} not found")
@@ -78,12 +78,15 @@ def run_script(script_name: str, *args) -> subprocess.CompletedProcess:
     cmd = [sys.executable, str(script_path)] + list(args)
     logger.info(f"Running command: {' '.join(cmd)}")
     
-    # Change to scripts directory so relative paths work
-    return subprocess.run(
-        cmd, 
+    # Change to scripts directory so relative paths work.
+    # subprocess.run in a worker thread (rather than asyncio's subprocess API) keeps the event loop free
+    # on every platform, including the SelectorEventLoop uvicorn uses on Windows with --reload.
+    return await asyncio.to_thread(
+        subprocess.run,
+        cmd,
         cwd=SCRIPTS_DIR,
-        capture_output=True, 
-        text=True, 
+        capture_output=True,
+        text=True,
         check=True
     )
 
@@ -98,7 +101,7 @@ async def search_artists(query: str) -> List[str]:
     if dal is None:
         raise HTTPException(status_code=503, detail="Data service not available")
     try:
-        results = dal.search_artists(query)
+        results = await asyncio.to_thread(dal.search_artists, query)
         return results
     except Exception as e:
         logger.error(f"Search failed: {str(e)}")
@@ -117,7 +120,7 @@ async def get_artist_connections(artist_name: str, degree: int = 1) -> Dict[str,
         raise HTTPException(status_code=400, detail="Degree cannot exceed 5")
     
     try:
-        connections = dal.get_artist_connections(artist_name, degree=degree)
+        connections = await asyncio.to_thread(dal.get_artist_connections, artist_name, degree)
         # Check if artist exists in data (even with no connections)
         if not dal.artist_exists(artist_name):
             raise HTTPException(
@@ -143,7 +146,7 @@ async def get_artist_connections_graph(artist_name: str, degree: int = 1) -> Dic
         raise HTTPException(status_code=400, detail="Degree cannot exceed 5")
     
     try:
-        graph_data = dal.get_artist_connections_graph(artist_name, degree=degree)
+        graph_data = await asyncio.to_thread(dal.get_artist_connections_graph, artist_name, degree)
         # Check if artist exists in data (even with no connections)
         if not dal.artist_exists(artist_name):
             raise HTTPException(
@@ -166,9 +169,9 @@ async def get_update_status():
         "completed": update_status.completed
     }
 
-def update_data_task():
+async def update_data_task():
     """Background task to update data"""
-    global update_status
+    global update_status, dal
     
     try:
         update_status.is_running = True
@@ -178,17 +181,23 @@ def update_data_task():
         # Step 1: Scrape new data
         update_status.current_step = "Scraping Billboard data..."
         logger.info("Starting data scraping")
-        run_script("scraper.py")
+        await run_script("scraper.py")
         
         # Step 2: Clean the data
         update_status.current_step = "Cleaning data..."
         logger.info("Starting data cleaning")
-        run_script("initial_cleaner.py")
+        await run_script("initial_cleaner.py")
         
         # Step 3: Process into JSON format
         update_status.current_step = "Processing collaborations..."
         logger.info("Starting data processing")
-        run_script("data_processor.py")
+        await run_script("data_processor.py")
+        
+        # Step 4: Reload the processed data, so every endpoint serves the new data
+        update_status.current_step = "Reloading data..."
+        logger.info("Reloading data")
+        dal = await asyncio.to_thread(load_data_access_layer)
+        _graph_cache.clear()  # Cached graph responses were built from the old data
         
         update_status.current_step = "Update completed successfully"
         update_status.completed = True
@@ -226,47 +235,27 @@ async def update_data(background_tasks: BackgroundTasks):
 
 @app.post("/api/generate-png")
 async def generate_png(svg_data: Dict[str, Any]):
-    """Generate PNG from SVG data using Selenium"""
+    """Generate PNG from SVG data using CairoSVG"""
     try:
         svg_content = svg_data.get("svg")
         if not svg_content:
             raise HTTPException(status_code=400, detail="SVG content is required")
 
-        # Create temporary SVG file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.svg', delete=False, encoding='utf-8') as temp_svg:
-            temp_svg.write(svg_content)
-            temp_svg_path = temp_svg.name
-
-        try:
-            # Output PNG path
-            output_png = STATIC_DIR / f"graph_{os.getpid()}_{os.urandom(4).hex()}.png"
-
-            # Call updated image_maker.py
-            result = subprocess.run([
-                sys.executable,
-                str(SCRIPTS_DIR / "image_maker.py"),
-                temp_svg_path,
-                str(output_png)
-            ], capture_output=True, text=True, timeout=30)
-            
-            if result.returncode != 0:
-                logger.error(f"Image conversion stderr: {result.stderr}")
-                logger.error(f"Image conversion stdout: {result.stdout}")
-                raise HTTPException(status_code=500, detail=f"Image conversion failed: {result.stderr}")
-
-            if not output_png.exists():
-                raise HTTPException(status_code=500, detail="PNG file was not created")
-
-            return FileResponse(
-                output_png,
-                media_type="image/png",
-                filename=f"collaboration-graph-{svg_data.get('timestamp', 'export')}.png"
-            )
-        finally:
-            # Clean up temporary SVG file
-            if os.path.exists(temp_svg_path):
-                os.unlink(temp_svg_path)
+        # Imported here so a missing native Cairo library only disables PNG export
+        from scripts.image_maker import render_png
+
+        # Rasterize in-process (3x scale, tagged as 300 DPI), off the event loop
+        png_bytes = await asyncio.to_thread(render_png, svg_content)
+
+        filename = f"collaboration-graph-{svg_data.get('timestamp', 'export')}.png"
+        return Response(
+            png_bytes,
+            media_type="image/png",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"PNG generation failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"PNG generation failed: {str(e)}")
@@ -290,61 +279,62 @@ async def download_data_file(filename: str):
     
     return FileResponse(file_path, filename=filename)
 
+# Serialized /api/graph/generate responses keyed by vertex limit, for the currently loaded data
+# (cleared whenever the data is reloaded)
+GRAPH_CACHE_SIZE = 32
+_graph_cache: Dict[int, bytes] = {}
+
+def build_graph_data(data_layer: DataAccessLayer, vertex_limit: int) -> Dict[str, List[Dict]]:
+    """Build the nodes/edges of the top `vertex_limit` artists by degree (CPU-bound, run off the event loop)."""
+    # Artist ids are pre-sorted by degree when the data is loaded
+    top_ids = data_layer.ids_by_degree_desc[:vertex_limit]
+    names = data_layer.artist_names
+    degree_of = data_layer.total_degree.tolist()
+
+    nodes = [
+        {"id": names[i], "name": names[i], "degree": degree_of[i]}
+        for i in top_ids.tolist()
+    ]
+
+    # Edges between the top artists, gathered from the CSR arrays
+    in_top = np.zeros(len(names), dtype=bool)
+    in_top[top_ids] = True
+    sources, targets, weights = data_layer.edges_within(top_ids, in_top)
+    edges = [
+        {
+            "source": names[i],
+            "target": names[j],
+            "weight": weight,
+            "degree": degree_of[i],
+            "name": names[i]
+        }
+        for i, j, weight in zip(sources.tolist(), targets.tolist(), weights.tolist())
+    ]
+    return {"nodes": nodes, "edges": edges}
+
 @app.post("/api/graph/generate")
 async def generate_graph(settings: Dict[str, Any]):
     """
     Generate graph data as JSON for the frontend.
     """
+    if dal is None:
+        raise HTTPException(status_code=503, detail="Data service not available")
+
     try:
-        # Path to processed data
-        data_path = DATA_DIR / "collaborations.json"
-        if not data_path.exists():
-            raise HTTPException(status_code=404, detail="Collaborations data not found")
-
-        # Load the data
-        with open(data_path, "r", encoding="utf-8") as f:
-            collaborations = json.load(f)
-
-        # --- Transform collaborations to nodes/edges ---
-        # This logic should match what your frontend did before.
-        # Example assumes collaborations is a dict: { artist: { collaborator: count, ... }, ... }
-        nodes = []
-        edges = []
-        node_set = set()
-
-        # Apply settings (e.g., vertexLimit)
+        # Apply settings (e.g., vertexLimit); it's the only setting that affects the response
         vertex_limit = settings.get("vertexLimit", 100)
-        shrink_method = settings.get("shrinkMethod", "degree")
 
-        # Sort and limit nodes by degree
-        sorted_artists = sorted(collaborations.items(), key=lambda x: -sum(x[1].values()))
-        limited_artists = [artist for artist, _ in sorted_artists[:vertex_limit]]
-
-        nodes = []
-        edges = []
-        node_set = set()
-        
-        for artist in limited_artists:
-            degree = sum(collaborations[artist].values())
-            node_set.add(artist)
-            nodes.append({
-                "id": artist,
-                "name": artist,
-                "degree": degree
-            })
-        
-        for artist in limited_artists:
-            degree = sum(collaborations[artist].values())  # <-- Add this line
-            for collaborator, weight in collaborations[artist].items():
-                if collaborator in node_set:
-                    edges.append({
-                        "source": artist,
-                        "target": collaborator,
-                        "weight": weight,
-                        "degree": degree,
-                        "name": artist
-                    })
-        return JSONResponse({"nodes": nodes, "edges": edges})
+        body = _graph_cache.get(vertex_limit)
+        if body is None:
+            data_layer = dal
+            graph_data = await asyncio.to_thread(build_graph_data, data_layer, vertex_limit)
+            body = orjson.dumps(graph_data)
+            # Don't cache a response built from data that was replaced while it was being built
+            if data_layer is dal:
+                if len(_graph_cache) >= GRAPH_CACHE_SIZE:
+                    _graph_cache.pop(next(iter(_graph_cache)))  # Evict the oldest entry
+                _graph_cache[vertex_limit] = body
+        return Response(body, media_type="application/json")
 
     except Exception as e:
         logger.error(f"Graph generation failed: {str(e)}")
@@ -1,35 +1,155 @@
-import json
+import mmap
+import threading
+import numpy as np
+import orjson
 from pathlib import Path
-from typing import Dict, List
-from collections import deque, defaultdict
+from typing import Callable, Dict, List, Set, Tuple
+from bisect import bisect_left
+from collections import Counter, OrderedDict, defaultdict
+from itertools import chain
+
+
+def _read_json(path: Path):
+    """Parses a JSON file straight from a read-only memory map, skipping the text decode and read() copy."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+def _edge_positions(indptr: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """Positions in a CSR indices/weights array of all edges out of `nodes`, in node order."""
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    # Each node's edge run [start, start + length) laid end to end
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return np.arange(lengths.sum()) + offsets
+
+
+def bfs_csr(
+    indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray, source: int, max_degree: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Breadth-first search over a CSR graph up to max_degree hops from source.
+    Expands a whole frontier per step with NumPy ops, visiting nodes in the same order as a queue-based BFS.
+
+    Returns:
+        (order, degree_of, count_of): reached ids in BFS order (source first), each id's degree of
+        separation (-1 if unreached), and the weight of the edge each id was first reached through
+    """
+    degree_of = np.full(len(indptr) - 1, -1, dtype=np.int32)
+    count_of = np.zeros(len(indptr) - 1, dtype=np.int32)
+    degree_of[source] = 0
+    frontier = np.array([source], dtype=np.int32)
+    levels = [frontier]
+
+    for level in range(1, max_degree + 1):
+        edges = _edge_positions(indptr, frontier)
+        candidates = indices[edges]
+        unseen = degree_of[candidates] < 0
+        candidates, edges = candidates[unseen], edges[unseen]
+        # Keep each newly reached id's first occurrence, i.e. the edge a queue would have taken
+        _, first = np.unique(candidates, return_index=True)
+        first.sort()
+        frontier = candidates[first]
+        if frontier.size == 0:
+            break
+        degree_of[frontier] = level
+        count_of[frontier] = weights[edges[first]]
+        levels.append(frontier)
+
+    return np.concatenate(levels), degree_of, count_of
+
 
 class DataAccessLayer:
     def __init__(self, data_file: Path, songs_to_artists_file: Path):
         self.data_file = data_file
         self.songs_to_artists_file = songs_to_artists_file
-        self.data: Dict[str, Dict[str, int]] = self._load_data()
+        data = self._load_data()
+        # CSR form of the collaborations dict: artist i's collaborators are indices[indptr[i]:indptr[i + 1]],
+        # with collaboration counts in the matching slice of weights.
+        # The nested dict itself isn't kept, so the graph is only held in memory once
+        self.artist_names: List[str] = list(data)
+        self.artist_ids: Dict[str, int] = {artist: i for i, artist in enumerate(self.artist_names)}
+        self.indptr, self.indices, self.weights = self._build_csr(data)
+        # Total collaboration count per artist id, and ids ranked by it (highest first)
+        cumulative_weights = np.concatenate(([0], np.cumsum(self.weights, dtype=np.int64)))
+        self.total_degree: np.ndarray = np.diff(cumulative_weights[self.indptr])
+        self.ids_by_degree_desc: np.ndarray = np.argsort(-self.total_degree, kind="stable")
         self.songs_to_artists: Dict[str, List[str]] = self._load_songs_to_artists()
+        self.artist_to_songs: Dict[str, List[str]] = self._build_artist_index()
+        self.all_artists: Set[str] = set(self.artist_to_songs)
+        # Artists sorted by lowercased name (with their lowercased names alongside) for search
+        self._artists_list: List[str] = sorted(self.all_artists, key=lambda artist: (artist.lower(), artist))
+        self._artists_lower: List[str] = [artist.lower() for artist in self._artists_list]
+        # Bounded LRU of finished query results, keyed by (query, artist, degree).
+        # It lives and dies with this instance: new data means a new DataAccessLayer, not a cleared cache
+        self._result_cache: "OrderedDict[Tuple[str, str, int], Dict]" = OrderedDict()
+        self.result_cache_size = 1024
+        self._result_cache_lock = threading.Lock()
 
     def _load_data(self) -> Dict[str, Dict[str, int]]:
         """Loads collaboration data from the JSON file."""
         try:
-            with open(self.data_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return _read_json(self.data_file)
         except FileNotFoundError:
             raise FileNotFoundError(f"Data file not found: {self.data_file}")
-        except json.JSONDecodeError:
+        except ValueError:  # orjson.JSONDecodeError, or mmap refusing an empty file
             raise ValueError(f"Invalid JSON format in: {self.data_file}")
 
     def _load_songs_to_artists(self) -> Dict[str, List[str]]:
         """Loads songs to artists mapping from the JSON file."""
         try:
-            with open(self.songs_to_artists_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return _read_json(self.songs_to_artists_file)
         except FileNotFoundError:
             raise FileNotFoundError(f"Songs to artists file not found: {self.songs_to_artists_file}")
-        except json.JSONDecodeError:
+        except ValueError:  # orjson.JSONDecodeError, or mmap refusing an empty file
             raise ValueError(f"Invalid JSON format in: {self.songs_to_artists_file}")
 
+    def _build_csr(self, data: Dict[str, Dict[str, int]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Flattens the nested collaboration dict `data` into CSR arrays (indptr, indices, weights).
+        Each row keeps the collaborator order of the JSON, which the BFS visits in; the data scripts
+        write collaborators in the order they first appear in the song list, so that's the visit order.
+        """
+        indptr = [0]
+        indices: List[int] = []
+        weights: List[int] = []
+        for artist in list(self.artist_names):
+            for collaborator, count in data[artist].items():
+                collaborator_id = self.artist_ids.get(collaborator)
+                if collaborator_id is None:
+                    # Collaborator without an entry of its own; give it an id (and an empty row below)
+                    collaborator_id = self.artist_ids[collaborator] = len(self.artist_names)
+                    self.artist_names.append(collaborator)
+                indices.append(collaborator_id)
+                weights.append(count)
+            indptr.append(len(indices))
+        indptr.extend([len(indices)] * (len(self.artist_names) + 1 - len(indptr)))
+        return (
+            np.asarray(indptr, dtype=np.int32),
+            np.asarray(indices, dtype=np.int32),
+            np.asarray(weights, dtype=np.int32),
+        )
+
+    def edges_within(self, ids: np.ndarray, members: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the (sources, targets, weights) of the edges out of `ids` that lead to artists flagged
+        in the boolean mask `members`, in the order of `ids` and then each artist's CSR row order.
+        """
+        edge_positions = _edge_positions(self.indptr, ids)
+        sources = np.repeat(ids, np.diff(self.indptr)[ids])
+        targets = self.indices[edge_positions]
+        internal = members[targets]
+        return sources[internal], targets[internal], self.weights[edge_positions[internal]]
+
+    def _build_artist_index(self) -> Dict[str, List[str]]:
+        """Builds the inverse mapping of artists to the songs they appear in, in a single pass."""
+        artist_to_songs: Dict[str, List[str]] = defaultdict(list)
+        for song, artists in self.songs_to_artists.items():
+            for artist in artists:
+                artist_to_songs[artist].append(song)
+        return dict(artist_to_songs)
+
 
     def get_artist_connections(self, artist_name: str, degree: int = 1) -> Dict[str, Dict]:
         """
@@ -41,27 +161,36 @@ class DataAccessLayer:
             degree: The degree of separation (1 = direct collaborators, 2 = collaborators of collaborators, etc.)
         
         Returns:
-            Dict mapping collaborator names to {'count': int, 'degree': int}
+            Dict mapping collaborator names to {'count': int, 'degree': int}.
+            Results are cached, so the returned dict is shared and must not be mutated.
         """
+        artist_name = artist_name.strip()
         if degree == 1:
             # Use optimized direct connections for degree 1
-            return self._get_direct_connections(artist_name)
+            return self._cached(('connections', artist_name, degree), self._get_direct_connections, artist_name)
         
         # Use BFS for higher degrees
-        return self._get_connections_bfs(artist_name, degree)
+        return self._cached(('connections', artist_name, degree), self._get_connections_bfs, artist_name, degree)
+    
+    def _cached(self, key: Tuple[str, str, int], compute: Callable[..., Dict], *args) -> Dict:
+        """Returns the cached result for key, computing it as compute(*args) on a miss."""
+        # Queries run on worker threads, so cache bookkeeping is locked (but not the computation itself)
+        with self._result_cache_lock:
+            result = self._result_cache.get(key)
+            if result is not None:
+                self._result_cache.move_to_end(key)
+                return result
+        
+        result = compute(*args)
+        with self._result_cache_lock:
+            self._result_cache[key] = result
+            if len(self._result_cache) > self.result_cache_size:
+                self._result_cache.popitem(last=False)  # Evict the least recently used result
+        return result
     
     def _get_direct_connections(self, artist_name: str) -> Dict[str, Dict]:
         """Get direct collaborators (degree 1) for an artist."""
-        artist_name = artist_name.strip()
-        connections: Dict[str, int] = {}
-        
-        # Iterate through all songs and find ones that include the artist
-        for song, artists in self.songs_to_artists.items():
-            if artist_name in artists:
-                # For each other artist in the same song, increment their collaboration count
-                for other_artist in artists:
-                    if other_artist != artist_name:
-                        connections[other_artist] = connections.get(other_artist, 0) + 1
+        connections = self._get_direct_collaborators_raw(artist_name)
         
         # Convert to new format
         result = {}
@@ -71,53 +200,39 @@ class DataAccessLayer:
         return result
     
     def _get_connections_bfs(self, artist_name: str, max_degree: int) -> Dict[str, Dict]:
-        """Get connections using BFS up to max_degree."""
+        """Get connections using BFS over the CSR graph up to max_degree."""
         artist_name = artist_name.strip()
-        visited = set([artist_name])
-        queue = deque([(artist_name, 0)])
-        connections = {}
-        
-        while queue:
-            current_artist, current_degree = queue.popleft()
-            if current_degree >= max_degree:
-                continue
-                
-            # Get direct collaborators for current artist
-            direct_collabs = self._get_direct_collaborators_raw(current_artist)
-            
-            for collab, count in direct_collabs.items():
-                if collab not in visited:
-                    # Add to connections if not already found at a closer degree
-                    if collab not in connections:
-                        connections[collab] = {'count': count, 'degree': current_degree + 1}
-                        queue.append((collab, current_degree + 1))
-                        visited.add(collab)
+        source = self.artist_ids.get(artist_name)
+        if source is None:
+            return {}
         
-        return connections
+        order, degree_of, count_of = bfs_csr(self.indptr, self.indices, self.weights, source, max_degree)
+        
+        # Translate ids back to names (skipping the source artist itself)
+        order = order[1:]
+        return {
+            self.artist_names[collab]: {'count': count, 'degree': degree}
+            for collab, count, degree in zip(order.tolist(), count_of[order].tolist(), degree_of[order].tolist())
+        }
     
     def _get_direct_collaborators_raw(self, artist_name: str) -> Dict[str, int]:
-        """Get direct collaborators as a simple dict of {collaborator: count}."""
+        """
+        Get direct collaborators as a simple dict of {collaborator: count}.
+        """
         artist_name = artist_name.strip()
-        connections: Dict[str, int] = {}
-        
-        # Iterate through all songs and find ones that include the artist
-        for song, artists in self.songs_to_artists.items():
-            if artist_name in artists:
-                # For each other artist in the same song, increment their collaboration count
-                for other_artist in artists:
-                    if other_artist != artist_name:
-                        connections[other_artist] = connections.get(other_artist, 0) + 1
+        connections: Dict[str, int] = Counter()
         
+        # Only visit the songs the artist actually appears in. Every artist on each song is counted
+        # (no per-artist comparison), then the artist's own count is dropped once at the end.
+        for song in self.artist_to_songs.get(artist_name, ()):
+            connections.update(self.songs_to_artists[song])
+        connections.pop(artist_name, None)
         return connections
 
 
     def artist_exists(self, artist_name: str) -> bool:
         """Check if an artist exists in the data."""
-        # Check if artist appears in any song
-        for artists in self.songs_to_artists.values():
-            if artist_name in artists:
-                return True
-        return False
+        return artist_name in self.all_artists
 
 
     def search_artists(self, query: str) -> List[str]:
@@ -126,27 +241,31 @@ class DataAccessLayer:
             return []
         
         query_lower = query.lower()
-        artist_set = set()
-        
-        # Collect all unique artists from songs_to_artists
-        for artists in self.songs_to_artists.values():
-            for artist in artists:
-                if query_lower in artist.lower():
-                    artist_set.add(artist)
         
-        results = list(artist_set)
+        # Exact and starts-with matches are one contiguous run of the sorted lowercase names
+        start = bisect_left(self._artists_lower, query_lower)
+        end = start
+        while end < len(self._artists_lower) and self._artists_lower[end].startswith(query_lower):
+            end += 1
         
         # Sort by relevance: exact matches first, then starts with, then contains
-        def sort_key(artist):
-            artist_lower = artist.lower()
-            if artist_lower == query_lower:
-                return (0, artist)
-            elif artist_lower.startswith(query_lower):
-                return (1, artist)
-            else:
-                return (2, artist)
-        
-        results.sort(key=sort_key)
+        matches = sorted(
+            zip(self._artists_lower[start:end], self._artists_list[start:end]),
+            key=lambda match: (match[0] != query_lower, match[1])
+        )
+        results = [artist for _, artist in matches]
+        
+        # Contains-only matches rank last, so only look for them if the top 20 isn't full yet
+        if len(results) < 20:
+            results.extend(sorted(
+                artist
+                for artist_lower, artist in chain(
+                    zip(self._artists_lower[:start], self._artists_list[:start]),
+                    zip(self._artists_lower[end:], self._artists_list[end:])
+                )
+                if query_lower in artist_lower
+            ))
+        
         return results[:20]  # Limit to top 20 results
 
     def get_artist_connections_graph(self, artist_name: str, degree: int = 1) -> Dict:
@@ -158,55 +277,45 @@ class DataAccessLayer:
             degree: The degree of separation
         
         Returns:
-            Dict with 'nodes' and 'edges' lists representing the complete graph structure
+            Dict with 'nodes' and 'edges' lists representing the complete graph structure.
+            Results are cached, so the returned dict is shared and must not be mutated.
         """
         artist_name = artist_name.strip()
+        return self._cached(('graph', artist_name, degree), self._build_connections_graph, artist_name, degree)
+    
+    def _build_connections_graph(self, artist_name: str, degree: int) -> Dict:
+        """Builds the nodes and edges of an artist's connections graph up to the specified degree."""
+        source = self.artist_ids.get(artist_name)
+        if source is None:
+            return {
+                'nodes': [{'id': artist_name, 'name': artist_name, 'degree': 0}],
+                'edges': []
+            }
+        
+        # Get all artists within the specified degree using BFS over the CSR graph
+        order, degree_of, _ = bfs_csr(self.indptr, self.indices, self.weights, source, degree)
+        in_graph = degree_of >= 0
         
-        # Get all artists within the specified degree using BFS
-        visited = set([artist_name])
-        queue = deque([(artist_name, 0)])
-        all_artists = set([artist_name])
-        
-        while queue:
-            current_artist, current_degree = queue.popleft()
-            
-            if current_degree < degree:
-                collaborators = self._get_direct_collaborators_raw(current_artist)
-                for collaborator in collaborators:
-                    if collaborator not in visited:
-                        visited.add(collaborator)
-                        all_artists.add(collaborator)
-                        queue.append((collaborator, current_degree + 1))
-        
-        # Build nodes
-        nodes = []
-        for artist in all_artists:
-            # Calculate degree (number of direct connections)
-            connections = self._get_direct_collaborators_raw(artist)
-            nodes.append({
-                'id': artist,
-                'name': artist,
-                'degree': len(connections)
-            })
+        # Build nodes (degree = number of direct connections)
+        degrees = np.diff(self.indptr)[order]
+        nodes = [
+            {'id': self.artist_names[i], 'name': self.artist_names[i], 'degree': d}
+            for i, d in zip(order.tolist(), degrees.tolist())
+        ]
         
         # Build edges between all artists in the graph
+        sources, targets, counts = self.edges_within(order, in_graph)
         edges = []
-        processed_pairs = set()
-        
-        for artist in all_artists:
-            connections = self._get_direct_collaborators_raw(artist)
-            for collaborator, count in connections.items():
-                if collaborator in all_artists:
-                    # Create a sorted pair to avoid duplicate edges
-                    pair = tuple(sorted([artist, collaborator]))
-                    if pair not in processed_pairs:
-                        processed_pairs.add(pair)
-                        edges.append({
-                            'source': pair[0],
-                            'target': pair[1],
-                            'weight': count,
-                            'name': f"{pair[0]} - {pair[1]}"
-                        })
+        for i, j, count in zip(sources.tolist(), targets.tolist(), counts.tolist()):
+            artist, collaborator = self.artist_names[i], self.artist_names[j]
+            # Collaborations are symmetric, so emit each pair once, from its alphabetically first artist
+            if artist < collaborator:
+                edges.append({
+                    'source': artist,
+                    'target': collaborator,
+                    'weight': count,
+                    'name': f"{artist} - {collaborator}"
+                })
         
         return {
             'nodes': nodes,
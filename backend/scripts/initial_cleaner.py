@@ -4,7 +4,11 @@ keeping only the entry with the best (lowest number) rank.
 Doing this greatly helps reduce the amount of data that needs to be processed.
 """
 
-import csv
+import pandas as pd
+
+# Used to uniquely identify a song
+# (specifically excludes `position` -- rank on chart -- since that can change between weeks)
+SONG_KEY = ["track", "artist", "featured_artists"]
 
 
 def main():
@@ -14,51 +18,38 @@ def main():
     """
     input_file_path = "../data/billboard_global_200.csv"
     output_file_path = "../data/cleaned.csv"
-    
-    best_records = {}  # key: (track, artist, featured_artists); value: dict with "position", etc.
-
-    # Open input CSV and supply our fieldnames.
-    with open(input_file_path, newline='', encoding="utf-8") as infile:
-        reader = csv.reader(infile)
-
-        # Skip header row, which should always be present
-        next(reader)
-
-        # Process the rest of the rows
-        for row in reader:
-            # Our CSV is expected to have these five columns:
-            _date, position_str, track, artist, featured_artists = row
-
-            try:
-                position = int(position_str.strip())
-            except ValueError:  # If the position is invalid, then skip this row.
-                continue
-
-            # Used to uniquely identify a song in the dictionary
-            # (specifically excludes `position` -- rank on chart -- since that can change between weeks)
-            key = (track.strip(), artist.strip(), featured_artists.strip())
 
-            # If the song is new or current ranking is better (lower number), update the record.
-            if key not in best_records or position < best_records[key]["position"]:
-                best_records[key] = {
-                    "position": position,
-                    "track": track.strip(),
-                    "artist": artist.strip(),
-                    "featured_artists": featured_artists.strip()
-                }
+    # Our CSV is expected to have these five columns, after a header row which should always be present.
+    # The date is never used, so it isn't loaded at all.
+    # Everything is read as text so that values like "N/A" are kept as-is.
+    df = pd.read_csv(
+        input_file_path,
+        header=0,
+        names=["date", "position", "track", "artist", "featured_artists"],
+        usecols=["position", *SONG_KEY],
+        dtype=str,
+        keep_default_na=False,
+        encoding="utf-8",
+    )
+    # Strip every field exactly once, a whole column at a time
+    df = df.apply(lambda column: column.str.strip())
+
+    # If the position is invalid, then skip this row.
+    df = df[df["position"].str.fullmatch(r"[+-]?\d+")].assign(position=lambda d: d["position"].astype(int))
+
+    # Keep the best (lowest number) rank of each song, in the order songs first appear
+    best_records = df.groupby(SONG_KEY, sort=False, as_index=False)["position"].min()
 
     write_to_new(output_file_path, best_records)
 
 
-def write_to_new(output_file_path: str, best_records: dict) -> None:
+def write_to_new(output_file_path: str, best_records: pd.DataFrame) -> None:
     """
     Write the cleaned records to the output CSV (without the date)
     """
-    with open(output_file_path, "w", newline='', encoding="utf-8") as outfile:
-        writer = csv.DictWriter(outfile, fieldnames=["position", "track", "artist", "featured_artists"])
-        writer.writeheader()
-        for record in best_records.values():
-            writer.writerow(record)
+    best_records[["position", *SONG_KEY]].to_csv(
+        output_file_path, index=False, encoding="utf-8", lineterminator="\r\n"
+    )
 
 
 if __name__ == "__main__":
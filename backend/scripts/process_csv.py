@@ -6,10 +6,16 @@ It can also save the dictionaries to disk so that the computation doesn't have t
 
 from __future__ import annotations
 
-import csv
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import re  # regex
-import json
+
+import orjson
+import pandas as pd
+
+from collab_counts import count_collaborations, index_artists
+
+# Matches any of the delimiters that separate artist names within a single field
+_SPLIT_RE = re.compile(r',|&|/| x | with | Featuring ')
 
 
 def build_relationship_dicts(file_path: str) -> tuple[dict, dict]:
@@ -37,70 +43,55 @@ def build_relationship_dicts(file_path: str) -> tuple[dict, dict]:
 
     print(f"Reading from {file_path}...")
 
-    collabs = {}
+    # Read everything as text, so that "N/A" stays a literal value
+    df = pd.read_csv(
+        file_path,
+        header=0,
+        names=["position", "track", "artist", "featured_artists"],
+        dtype=str,
+        keep_default_na=False,
+    )
+
+    # One (song, artist) row per artist involved in each song, where songs are identified by their row number
+    memberships = (
+        pd.concat([split_artists(df["artist"]), split_artists(df["featured_artists"])])
+        .sort_index(kind="stable")
+        .rename("artist")
+        .rename_axis("song")
+        .reset_index()
+        .drop_duplicates()
+    )
+
+    memberships, names = index_artists(memberships)
 
     # Maps songs to a list of names of artists involved
     # (using lists & not sets for json serialisability)
     songs_artists = {}
 
-    with open(file_path, "r") as file:
-        reader = csv.reader(file)
-        next(reader)  # Skip header line
-        for row in reader:
-            top_rank, title, artists_str, featured = row
-
-            artists = set.union(split_artists(artists_str), split_artists(featured))
+    artist_id_lists = memberships.groupby("song", sort=False)["artist_id"].agg(list).reindex(df.index)
+    for title, ids, top_rank in zip(df["track"], artist_id_lists, df["position"].astype(int)):
+        # Songs without any artists are still recorded
+        artists = [names[i] for i in ids] if isinstance(ids, list) else []
+        song = Song(title, tuple(artists), top_rank)
+        songs_artists[song.serialise()] = artists
 
-            song = Song(title, list(artists), int(top_rank))
-            songs_artists[song.serialise()] = list(artists)
+    return count_collaborations(memberships, names), songs_artists
 
-            # Might be better here to just go straight to a graph
-            # Instead of writing a dictionary first
-            update_collab_counts(collabs, artists)
 
-    return collabs, songs_artists
-
-
-def update_collab_counts(collabs: dict[str, dict[str, int]], collaborating_artists: set[str]) -> None:
+def split_artists(artist_strs: pd.Series) -> pd.Series:
     """
-    Given a dictionary `collabs` mapping artists to dicts of other artists they've collaborated with,
-    along with how many times they've collaborated, mutate `collabs`.
+    Split every string in `artist_strs`, each listing artists by commas (and optionally other delimiters).
+    The CSV parser already handles quoted fields, so commas inside names are preserved.
 
-    For every unique pair of two artists in `collaborating_artists`, increment their collaboration count
-    in `collabs`.
+    Return one artist name per entry, indexed by the position in `artist_strs` of the string it came from.
     """
+    artist_strs = artist_strs[artist_strs != "N/A"]
 
-    for artist in collaborating_artists:
-        if artist not in collabs:
-            collabs[artist] = {}
-        for other_artist in collaborating_artists:
-            if other_artist == artist:
-                continue
-            if other_artist not in collabs[artist]:
-                collabs[artist][other_artist] = 1
-            else:
-                collabs[artist][other_artist] += 1
-
-
-def split_artists(artist_str: str) -> set[str]:
-    """
-    Split a string that lists artists by commas (and optionally other delimiters).
-    The CSV parser already handles quoted fields, so commas inside names are preserved.
-    """
-    if not isinstance(artist_str, str) or artist_str == "N/A":
-        return set()
-
-    # Split on commas, and also on & and / for robustness
-    # (You can add more delimiters if needed)
-    delimiters = [',', '&', '/', ' x ', ' with ', ' Featuring ']
-    temp = [artist_str]
-    for delim in delimiters:
-        new_temp = []
-        for s in temp:
-            new_temp.extend(s.split(delim))
-        temp = new_temp
-    # Remove whitespace and empty strings
-    return {a.strip() for a in temp if a.strip()}
+    # Split on commas, and also on & and / for robustness, all in a single pass
+    # (You can add more delimiters to _SPLIT_RE if needed)
+    artists = artist_strs.str.split(_SPLIT_RE).explode().dropna().str.strip()
+    # Remove empty strings
+    return artists[artists != ""]
 
 
 def save_dict(data: dict, file_path: str) -> None:
@@ -112,21 +103,24 @@ def save_dict(data: dict, file_path: str) -> None:
     """
 
     # Save the JSON with indentation for readability
-    with open(file_path, "w") as file:
-        json.dump(data, file, indent=4)
+    with open(file_path, "wb") as file:
+        file.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Song:
     """
     Represents a song that appeared on the charts.
 
     Instance Attributes:
         - title: The title of the song.
-        - artists: A list of names of the artists who made the song.
+        - artists: A tuple of names of the artists who made the song.
                    Makes no distinction between main/featured/etc artists.
         - top_rank: The top rank this song achieved on Billboard.com.
 
+    Private Instance Attributes:
+        - _key: The cached result of self.serialise(), computed on first use.
+
     Representation Invariants:
         - self.title.strip() != ""
         - len(self.artists) >= 1
@@ -134,8 +128,9 @@ class Song:
     """
 
     title: str
-    artists: list[str]
+    artists: tuple[str, ...]
     top_rank: int
+    _key: str | None = field(default=None, init=False, repr=False, compare=False)
 
     def serialise(self) -> str:
         """
@@ -146,7 +141,10 @@ class Song:
               since these are used as delimiters in the serialisation.
               (This never occurs in the actual dataset we're working with.)
         """
-        return f"{self.title}/////{'&&&'.join(self.artists)}/////{str(self.top_rank)}"
+        if self._key is None:
+            # Songs are frozen, so the cache has to bypass the generated __setattr__
+            object.__setattr__(self, "_key", f"{self.title}/////{'&&&'.join(self.artists)}/////{str(self.top_rank)}")
+        return self._key
 
     @staticmethod
     def deserialise(serialised_song: str) -> Song:
@@ -158,15 +156,7 @@ class Song:
             - serialised_song is a validly serialised Song.
         """
         title, artists_str, top_rank_str = serialised_song.split("/////")
-        return Song(title, artists_str.split("&&&"), int(top_rank_str))
-
-    def __hash__(self) -> int:
-        """
-        Returns a hash of this object.
-        """
-        # This is needed to be able to use this object as a key in a dictionary.
-        # Hashes the serialised form since I'm not confident in my ability to write a reliable hash function.
-        return hash(self.serialise())
+        return Song(title, tuple(artists_str.split("&&&")), int(top_rank_str))
 
 
 def main():
@@ -1,13 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import threading
 import time
 import csv
 import re
 import os
 from typing import Optional
 
-import bs4.element
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from selectolax.lexbor import LexborHTMLParser, LexborNode
+
+# Matches a featuring keyword (feat., featuring, ft.) surrounded by whitespace
+_FEAT_RE = re.compile(r'\s+(feat\.?|featuring|ft\.?)\s+', re.IGNORECASE)
+
+# Shared session so every weekly request reuses the same keep-alive connection to billboard.com
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                   "AppleWebKit/537.36 (KHTML, like Gecko) "
+                   "Chrome/115.0.0.0 Safari/537.36")
+})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
+
+# Weeks are scraped concurrently, but new requests are still started at most once per REQUEST_INTERVAL seconds
+MAX_WORKERS = 4
+REQUEST_INTERVAL = 0.25
+_rate_lock = threading.Lock()
+_next_request_time = 0.0
+
+
+def _wait_for_rate_limit() -> None:
+    """
+    Block the calling thread until it is allowed to start a new request,
+    so that requests across all worker threads are spaced at least REQUEST_INTERVAL seconds apart.
+    """
+    global _next_request_time
+    with _rate_lock:
+        now = time.monotonic()
+        wait = _next_request_time - now
+        _next_request_time = max(now, _next_request_time) + REQUEST_INTERVAL
+    if wait > 0:
+        time.sleep(wait)
+
+
+def _read_last_lines(file_path: str, count: int, chunk_size: int = 4096) -> list[str]:
+    """
+    Return the last `count` lines of the file at `file_path` (or all of its lines, if it has fewer).
+    The file is read backwards from the end in chunks, so only its tail is loaded, regardless of its size.
+    """
+    with open(file_path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        tail = b""
+        # One extra newline guarantees the first of the kept lines is complete
+        while pos > 0 and tail.count(b"\n") <= count:
+            read_size = min(chunk_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            tail = f.read(read_size) + tail
+    return [line.decode('utf-8') for line in tail.splitlines()[-count:]]
 
 
 def split_artist(artist_str: str) -> tuple[str, str]:
@@ -19,19 +70,19 @@ def split_artist(artist_str: str) -> tuple[str, str]:
     """
     artist_str = artist_str.strip()
     # Search for the first occurrence of a featuring keyword.
-    match = re.search(r'\s+(feat\.?|featuring|ft\.?)\s+', artist_str, flags=re.IGNORECASE)
+    match = _FEAT_RE.search(artist_str)
     if match:
         main_artist = artist_str[:match.start()].strip()
         featuring = artist_str[match.end():].strip()
         # Replace any additional featuring keywords with a comma separator.
-        featuring = re.sub(r'\s+(feat\.?|featuring|ft\.?)\s+', ', ', featuring, flags=re.IGNORECASE)
+        featuring = _FEAT_RE.sub(', ', featuring)
     else:
         main_artist = artist_str
         featuring = ""
     return main_artist, featuring
 
     
-def parse_chart_row(row: bs4.element.Tag, date_str: str) -> Optional[dict]:
+def parse_chart_row(row: LexborNode, date_str: str) -> Optional[dict]:
     """
     Parses a single chart row (a <ul class="o-chart-results-list-row"> element)
     to extract:
@@ -42,31 +93,33 @@ def parse_chart_row(row: bs4.element.Tag, date_str: str) -> Optional[dict]:
     """
     try:
         # The first <li> is assumed to contain the rank number.
-        rank_li = row.find("li")
+        rank_li = row.css_first("li")
         if not rank_li:
             return None
         # Try to locate the span with the rank (often with a class including "a-font-primary-bold-l")
-        rank_span = rank_li.find("span", class_=lambda x: x and "a-font-primary-bold-l" in x)
+        rank_span = rank_li.css_first('span[class*="a-font-primary-bold-l"]')
         if not rank_span:
-            rank_span = rank_li.find("span", class_="c-label")
+            rank_span = rank_li.css_first("span.c-label")
         if not rank_span:
             return None
-        rank_text = rank_span.get_text(strip=True)
+        rank_text = rank_span.text(strip=True)
         rank = int(rank_text)
     except ValueError as e:
         print("Error extracting rank:", e)
         return None
 
     # Extract the song title from <h3 id="title-of-a-story">
-    title_h3 = row.find("h3", id="title-of-a-story")
-    song = title_h3.get_text(strip=True) if title_h3 else ""
+    title_h3 = row.css_first("h3#title-of-a-story")
+    song = title_h3.text(strip=True) if title_h3 else ""
 
-    # Extract artist info from the <span> immediately following the <h3>
+    # Extract artist info from the first <span> sibling following the <h3>
     artist_text = ""
     if title_h3:
-        artist_span = title_h3.find_next_sibling("span")
+        artist_span = title_h3.next
+        while artist_span is not None and artist_span.tag != "span":
+            artist_span = artist_span.next
         if artist_span:
-            artist_text = artist_span.get_text(strip=True)
+            artist_text = artist_span.text(strip=True)
 
     main_artist, featuring = split_artist(artist_text)
     # If there's no featuring info, mark it as "N/A"
@@ -88,21 +141,21 @@ def scrape_chart(date_str: str) -> list[dict]:
     Returns a list of dictionaries (one per chart row).
     """
     url = f"https://www.billboard.com/charts/billboard-global-200/{date_str}/#"
-    headers = {
-        "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                       "AppleWebKit/537.36 (KHTML, like Gecko) "
-                       "Chrome/115.0.0.0 Safari/537.36")
-    }
+    _wait_for_rate_limit()
     print(f"Scraping: {url}")
-    response = requests.get(url, headers=headers)
+    try:
+        response = _SESSION.get(url, timeout=10)
+    except requests.RequestException as e:
+        print(f"Failed to retrieve data for {date_str} ({e})")
+        return []
     if response.status_code != 200:
         print(f"Failed to retrieve data for {date_str} (Status code: {response.status_code})")
         return []
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    tree = LexborHTMLParser(response.text)
     results = []
     # Select each chart row using its unique CSS class.
-    rows = soup.select("ul.o-chart-results-list-row")
+    rows = tree.css("ul.o-chart-results-list-row")
     for row in rows:
         entry = parse_chart_row(row, date_str)
         if entry:
@@ -120,20 +173,18 @@ def main():
 
     # Set the starting date based on CSV content or default
     if os.path.isfile(scrape_target_path):
-        # Read the second-to-last line of the CSV
-        with open(scrape_target_path, 'r', encoding='utf-8') as csvfile:
-            # Use a list to store all lines
-            lines = list(csvfile)
-            if len(lines) > 1:  # Check if file has more than just header
-                second_last_line = lines[-2]  # Get second-to-last line
-                last_date_str = second_last_line.split(',')[0]  # First column is date
-
-                # set the start date to the next week
-                # (i.e. start scraping for the week after the last week we already have)
-                start_date = datetime.strptime(last_date_str, "%Y-%m-%d") + timedelta(days=7)
-            else:
-                print("Freshly scraping data from global 200 charts...\nThis might take a while...")
-                start_date = datetime.strptime("2020-09-05", "%Y-%m-%d")
+        # Read the second-to-last line of the CSV, without loading the whole file
+        lines = _read_last_lines(scrape_target_path, 2)
+        if len(lines) > 1:  # Check if file has more than just header
+            second_last_line = lines[-2]  # Get second-to-last line
+            last_date_str = second_last_line.split(',')[0]  # First column is date
+
+            # set the start date to the next week
+            # (i.e. start scraping for the week after the last week we already have)
+            start_date = datetime.strptime(last_date_str, "%Y-%m-%d") + timedelta(days=7)
+        else:
+            print("Freshly scraping data from global 200 charts...\nThis might take a while...")
+            start_date = datetime.strptime("2020-09-05", "%Y-%m-%d")
     else:
         print("Freshly scraping data from global 200 charts...\nThis might take a while...")
         start_date = datetime.strptime("2020-09-05", "%Y-%m-%d")
@@ -148,20 +199,28 @@ def main():
         if not file_exists:
             writer.writeheader()
 
+        dates = []
         current_date = start_date
         while current_date <= end_date:
-            date_str = current_date.strftime("%Y-%m-%d")
-            try:
-                weekly_data = scrape_chart(date_str)
-                if weekly_data:
-                    writer.writerows(weekly_data)
-                    csvfile.flush()  # flush the output to disk immediately
-                time.sleep(0.25)  # short pause between requests
-            except KeyboardInterrupt:
-                print(f"\nKeyboard interrupt detected while processing {date_str}.")
-                csvfile.flush()
-                break
+            dates.append(current_date.strftime("%Y-%m-%d"))
             current_date += timedelta(days=7)
+
+        # Fetch and parse weeks in parallel; map() yields results in date order, so rows are still written in order
+        executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        results = executor.map(scrape_chart, dates)
+        try:
+            for date_str in dates:
+                try:
+                    weekly_data = next(results)
+                    if weekly_data:
+                        writer.writerows(weekly_data)
+                        csvfile.flush()  # flush the output to disk immediately
+                except KeyboardInterrupt:
+                    print(f"\nKeyboard interrupt detected while processing {date_str}.")
+                    csvfile.flush()
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
     print("Scraping complete.")
 
 